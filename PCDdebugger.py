@@ -3,20 +3,207 @@
 import argparse
 import subprocess
 import os
+import sys
+import io
 import json
-import ast
-from datetime import datetime
+import socket
+import signal
+import atexit
+import functools
+import contextlib
+import tempfile
+import shlex
 import shutil
+import importlib.util
+from datetime import datetime
 import re
 import gzip
+import zipfile
+import tarfile
+import time
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import yaml
 
+try:
+    from yaml import CSafeLoader as YamlSafeLoader # libyaml-backed loader, much faster on large Consul dumps
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+try:
+    import openstack
+except ImportError:
+    openstack = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_OUTPUT_DIR = f"PCDdebugger-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
 OUTPUT_DIR = DEFAULT_OUTPUT_DIR
 USE_INSECURE = False # Will be set to True if the script is run with --insecure
+QUIET = False # Set by --quiet to hide [RUNNING]/[CACHED]/[INFO] progress lines
+MAX_PARALLEL_CMDS = 8 # Upper bound on concurrent openstack API calls
+# Commands are spawned with close_fds=False and an absolute executable path (see resolve_executable()), the
+# conditions under which CPython uses posix_spawn (vfork) instead of fork+exec. Leaving fds open is safe because
+# Python opens files, pipes and sockets non-inheritable by default (PEP 446).
+MYSQL_DUMP_TIMEOUT = 1800 # Seconds before a running mysqldump is killed
+STREAM_CHUNK_SIZE = 64 * 1024 # Read/write buffer size when streaming command output to disk
+DUMP_CHUNK_SIZE = 1024 * 1024 # Larger reads for multi-GB dumps mean fewer compressor calls per byte
+_PAREN_ID = re.compile(r'\(([^)]+)\)') # Matches the "(id)" part of "name (id)" CLI values
+CONSUL_SPLIT_MARKER = "---#SPLIT#---" # Separates the YAML documents of the combined Consul dump
+load_json = orjson.loads if orjson else json.loads # orjson parses large listings several times faster; both raise ValueError
+COMPRESSED_SUFFIX = ".zst" if zstd else ".gz" # zstd is much faster than gzip when the module is available
+PRECOMPRESSED_SUFFIXES = (".gz", ".zst") # Artifacts that are stored rather than deflated again when zipping
+# Without zstandard the dump is gzipped inside the pod, by pigz on 4 threads when it is installed there (capped so the
+# compression does not starve the database proxy it shares the pod with)
+POD_GZIP_CMD = "if command -v pigz >/dev/null 2>&1; then pigz -1 -p 4; else gzip -1; fi"
+
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_PARALLEL_CMDS) # Runs single commands; its tasks never wait on other tasks
+TASK_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_PARALLEL_CMDS) # Runs collectors, which may wait on EXECUTOR commands
+API_SEMAPHORE = threading.Semaphore(MAX_PARALLEL_CMDS)
+_ensured_dirs = set() # Directories already created this run, so repeated saves skip makedirs
+ARCHIVE = None # Open tarfile that artifacts are streamed into when --tar is used, instead of OUTPUT_DIR
+ARCHIVE_PATH = None # File that ARCHIVE is written to
+_ARCHIVE_STREAMS = [] # Compressor and file underneath ARCHIVE, closed after it
+_ARCHIVE_LOCK = threading.Lock()
+_WRITE_Q = queue.Queue() # (path, bytes) artifacts waiting for the writer thread, see save_binary()
+# Resources already collected this run, so shared networks, subnets and security groups are fetched once
+_collected = {"network": set(), "subnet": set(), "sg": set(), "image": set(), "flavor": set(),
+              "server": set(), "server_ports": set(), "attachment": set()}
+_COLLECTED_LOCK = threading.Lock()
+_project_sg_lists = {} # project ID -> futures of its `security group list` and `security group rule list`, fetched once per run
+OS_SERVER_SOCKET = None # Path of the warm openstackclient server socket, set by start_openstack_server()
+_OS_SERVER_LOCK = threading.Lock()
+CONN = None # openstacksdk connection, set by connect_openstack_sdk() when openstacksdk is installed
+
+# The script is single-shot, so `show` results are cached for the whole run and never invalidated
+CACHEABLE_SHOW_RESOURCES = {"server", "port", "volume", "network", "subnet", "image", "flavor", "stack", "user"}
+_SHOW_CACHE = {}
+
+def _handle_openstack_request(conn, shell_cls):
+    """Runs one openstack CLI invocation in a forked server child and sends back its output."""
+    request = json.loads(conn.makefile("rb").read())
+    os.environ.clear()
+    os.environ.update(request["env"])
+    stdout, stderr = io.StringIO(), io.StringIO()
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        returncode = shell_cls().run(request["argv"])
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        stderr.write(str(e))
+        returncode = 1
+    conn.sendall(json.dumps({"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}).encode())
+    conn.close()
+
+def _serve_openstack(server_sock):
+    """Imports openstackclient once, then forks a pre-warmed child for every incoming request."""
+    from openstackclient.shell import OpenStackShell
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        conn, _ = server_sock.accept()
+        if os.fork() == 0:
+            server_sock.close()
+            try:
+                _handle_openstack_request(conn, OpenStackShell)
+            finally:
+                os._exit(0)
+        conn.close()
+
+def start_openstack_server():
+    """Forks a long-lived openstackclient server so openstack commands skip the CLI's interpreter startup cost.
+    Must be called before any worker threads are started. Does nothing if openstackclient is not importable."""
+    global OS_SERVER_SOCKET
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        return
+    if importlib.util.find_spec("openstackclient") is None:
+        log_debug("[INFO] openstackclient is not importable; each openstack command will run as a separate process.")
+        return
+
+    # Anyone who can connect runs openstack commands as this user with an environment of their choosing, so the
+    # socket lives in a private 0700 directory rather than at a guessable path in the shared temp directory
+    server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock_dir = None
+    try:
+        sock_dir = tempfile.mkdtemp(prefix="pcddbg-os-")
+        sock_path = os.path.join(sock_dir, "openstack.sock")
+        server_sock.bind(sock_path)
+        server_sock.listen(MAX_PARALLEL_CMDS)
+    except OSError as e:
+        server_sock.close()
+        if sock_dir:
+            shutil.rmtree(sock_dir, ignore_errors=True)
+        print(f"[WARN] Could not start the openstackclient server, each openstack command will run as a separate process: {e}")
+        return
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _serve_openstack(server_sock)
+        except Exception as e:
+            # Otherwise the cause is lost and the parent only sees refused connections
+            print(f"[WARN] openstackclient server stopped: {e!r}")
+            sys.stdout.flush()
+        finally:
+            os._exit(1)
+    server_sock.close()
+
+    def stop_openstack_server():
+        os.kill(pid, signal.SIGTERM)
+        shutil.rmtree(sock_dir, ignore_errors=True)
+    atexit.register(stop_openstack_server)
+    OS_SERVER_SOCKET = sock_path
+    log_debug(f"[INFO] Started openstackclient server (pid {pid}) on {sock_path}")
+
+def log_debug(message):
+    """Prints a progress line, unless --quiet was given. Warnings, errors and results always print."""
+    if not QUIET:
+        print(message)
+
+def disable_openstack_server(error):
+    """Sends all later openstack commands straight to subprocesses after the warm server fails, warning only once."""
+    global OS_SERVER_SOCKET
+    with _OS_SERVER_LOCK:
+        if OS_SERVER_SOCKET is None:
+            return
+        OS_SERVER_SOCKET = None
+    print(f"[WARN] openstackclient server unavailable, running openstack commands directly: {error}")
+
+def run_via_openstack_server(cmd, sock_path):
+    """Sends an openstack command to the warm server and returns a CompletedProcess, raising CalledProcessError on failure."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(sock_path)
+        client.sendall(json.dumps({"argv": cmd[1:], "env": dict(os.environ)}).encode())
+        client.shutdown(socket.SHUT_WR)
+        response = json.loads(client.makefile("rb").read())
+    if response["returncode"] != 0:
+        raise subprocess.CalledProcessError(response["returncode"], cmd, output=response["stdout"], stderr=response["stderr"])
+    return subprocess.CompletedProcess(cmd, 0, stdout=response["stdout"], stderr=response["stderr"])
+
+def _is_cacheable_show(cmd):
+    """Returns True for `openstack <resource> show ...` commands whose output can be reused within a run."""
+    if not isinstance(cmd, list) or cmd[0] != "openstack":
+        return False
+    args = [arg for arg in cmd[1:] if arg != "--insecure"]
+    return len(args) > 2 and args[0] in CACHEABLE_SHOW_RESOURCES and args[1] == "show"
 
-def run_cmd(cmd, shell=False):
-    """Runs a command, adding --insecure (if flagged) and --max-width to openstack commands, and returns output and the command string."""
+@functools.lru_cache(maxsize=None)
+def resolve_executable(name):
+    """Returns the absolute PATH lookup of a command name, or None if it is not found. subprocess only takes
+    the posix_spawn fast path for an executable with a directory component."""
+    return shutil.which(name)
+
+def run_cmd(cmd):
+    """Runs a command, adding --insecure (if flagged) and `-f json` to openstack commands, and returns output and the command string."""
     
     # Automatically add flags to openstack commands
     if isinstance(cmd, list) and cmd[0] == "openstack":
@@ -24,39 +211,241 @@ def run_cmd(cmd, shell=False):
         if USE_INSECURE and "--insecure" not in cmd:
             cmd.insert(1, "--insecure")
         
-        # Add --max-width to list/show commands for better formatting, unless a specific format is requested
-        is_list_or_show = any(sub in ["list", "show"] for sub in cmd)
-        is_formatted_output = any(flag in cmd for flag in ["-f", "--format"])
-        if is_list_or_show and "--max-width" not in cmd and not is_formatted_output:
-            cmd.extend(["--max-width", "170"])
+        # Request JSON from list/show commands unless a specific format is requested. Callers index the parsed
+        # output directly and save_record() renders the human-readable table locally, so one call serves both.
+        is_list_or_show = any(sub in ("list", "show") for sub in cmd)
+        # Also matches the attached spellings `-fvalue` and `--format=value`
+        is_formatted_output = any(arg.startswith(("-f", "--format")) for arg in cmd)
+        if is_list_or_show and not is_formatted_output:
+            cmd.extend(["-f", "json"])
             
     cmd_str = ' '.join(cmd) if isinstance(cmd, list) else cmd
-    print(f"[RUNNING] {cmd_str}")
+    cache_key = tuple(cmd) if _is_cacheable_show(cmd) else None
+    if cache_key in _SHOW_CACHE:
+        log_debug(f"[CACHED] {cmd_str}")
+        return _SHOW_CACHE[cache_key], cmd_str
+    log_debug(f"[RUNNING] {cmd_str}")
     
     try:
-        result = subprocess.run(cmd, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        return result.stdout.strip(), cmd_str
+        with API_SEMAPHORE:
+            result = None
+            sock_path = OS_SERVER_SOCKET # Read once, as another thread may disable the server meanwhile
+            if sock_path and isinstance(cmd, list) and cmd[0] == "openstack":
+                try:
+                    result = run_via_openstack_server(cmd, sock_path)
+                except (OSError, ValueError) as e:
+                    disable_openstack_server(e)
+            if result is None:
+                # os.environ carries the OS_TOKEN/OS_AUTH_TYPE exported by check_openstack_auth()
+                result = subprocess.run(cmd, executable=resolve_executable(cmd[0]), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        text=True, check=True, close_fds=False, env=os.environ)
+        output = result.stdout.strip()
+        if cache_key:
+            _SHOW_CACHE[cache_key] = output
+        return output, cmd_str
     except subprocess.CalledProcessError as e:
         error_msg = f"ERROR: {e.stderr.strip()}"
         print(f"[ERROR] Command failed: {cmd_str}\n{e.stderr.strip()}")
         return error_msg, cmd_str
 
+def run_cmds(cmds):
+    """Runs independent commands concurrently and returns their (output, command string) results in the same order."""
+    futures = [EXECUTOR.submit(run_cmd, cmd) for cmd in cmds]
+    return [future.result() for future in futures]
+
+def _claim(kind, resource_id):
+    """Returns True the first time a resource of the given kind is claimed this run, False afterwards."""
+    with _COLLECTED_LOCK:
+        if resource_id in _collected[kind]:
+            return False
+        _collected[kind].add(resource_id)
+        return True
+
+def project_security_groups(project_id):
+    """Returns the (output, command string) results of listing a project's security groups and all of their rules.
+    The two list calls are issued once per project and shared by every port that needs them."""
+    with _COLLECTED_LOCK:
+        if project_id not in _project_sg_lists:
+            _project_sg_lists[project_id] = (
+                EXECUTOR.submit(run_cmd, ["openstack", "security", "group", "list", "--project", project_id]),
+                EXECUTOR.submit(run_cmd, ["openstack", "security", "group", "rule", "list", "--project", project_id]),
+            )
+        futures = _project_sg_lists[project_id]
+    return [future.result() for future in futures]
+
+def _ensure_parent_dir(path):
+    """Creates the parent directory of path once per run."""
+    directory = os.path.dirname(path)
+    if directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+
+def open_tar_archive():
+    """Opens a compressed tar stream next to OUTPUT_DIR that all artifacts are written into, and returns its path."""
+    global ARCHIVE, ARCHIVE_PATH
+    archive_path = ARCHIVE_PATH = f"{OUTPUT_DIR}.tar{COMPRESSED_SUFFIX}"
+    raw = open(archive_path, "wb", buffering=STREAM_CHUNK_SIZE)
+    writer = open_compressed_writer(raw)
+    _ARCHIVE_STREAMS.extend([writer, raw])
+    ARCHIVE = tarfile.open(fileobj=writer, mode="w|")
+    return archive_path
+
+def close_tar_archive():
+    """Finishes the tar stream and flushes the compressor and file underneath it."""
+    ARCHIVE.close()
+    for stream in _ARCHIVE_STREAMS:
+        stream.close()
+
+def _add_to_archive(path, fileobj, size):
+    """Appends size bytes from fileobj to the tar stream as path, relative to OUTPUT_DIR."""
+    info = tarfile.TarInfo(os.path.relpath(path, OUTPUT_DIR))
+    info.size = size
+    info.mtime = int(time.time())
+    with _ARCHIVE_LOCK:
+        ARCHIVE.addfile(info, fileobj)
+
+def _write_artifact(path, data):
+    """Writes data to path, or appends it to the tar stream when --tar is used."""
+    if ARCHIVE is not None:
+        _add_to_archive(path, io.BytesIO(data), len(data))
+        return
+    _ensure_parent_dir(path)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def _writer_loop():
+    """Drains _WRITE_Q, so collectors hand off their artifacts and go straight on to the next command.
+    A failed write is reported and skipped; the thread must keep draining or flush_writes() would block forever."""
+    while True:
+        path, data = _WRITE_Q.get()
+        try:
+            _write_artifact(path, data)
+        except Exception as e: # Includes compressor errors such as zstandard.ZstdError, which are not OSErrors
+            print(f"[ERROR] Could not write {path}: {e}")
+        finally:
+            _WRITE_Q.task_done()
+
+def start_writer_thread():
+    """Starts the daemon thread that writes queued artifacts."""
+    threading.Thread(target=_writer_loop, name="artifact-writer", daemon=True).start()
+
+def flush_writes():
+    """Blocks until every queued artifact has been written."""
+    _WRITE_Q.join()
+
 def save_text(text, path, command_str=None):
     """Saves text to a file, prepending the command that generated it."""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        if command_str:
-            header = f"# Command: {command_str}\n# {'-'*70}\n\n"
-            f.write(header)
-        f.write(text)
+    header = f"# Command: {command_str}\n# {'-'*70}\n\n" if command_str else ""
+    save_binary(f"{header}{text}".encode(), path)
+
+def _table_cell_lines(value):
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value).splitlines() or [""]
+
+def _json_to_table(data):
+    """Renders parsed `-f json` output in the CLI's table layout: Field/Value rows for a record, one row per item for a list."""
+    if isinstance(data, dict):
+        headers, rows = ["Field", "Value"], [[key, value] for key, value in data.items()]
+    elif isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        if not data:
+            return ""
+        headers = list(dict.fromkeys(key for item in data for key in item))
+        rows = [[item.get(key, "") for key in headers] for item in data]
+    else:
+        return json.dumps(data, indent=2)
+
+    cells = [[_table_cell_lines(value) for value in row] for row in [headers] + rows]
+    widths = [max(len(line) for row in cells for line in row[col]) for col in range(len(headers))]
+    separator = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+    lines = [separator]
+    for index, row in enumerate(cells):
+        for line_no in range(max(len(cell) for cell in row)):
+            lines.append("| " + " | ".join((cell[line_no] if line_no < len(cell) else "").ljust(width)
+                                           for cell, width in zip(row, widths)) + " |")
+        if index == 0:
+            lines.append(separator)
+    lines.append(separator)
+    return "\n".join(lines)
+
+def save_record(output, path, command_str=None):
+    """Saves `-f json` command output as a readable table at path and verbatim alongside it as .json.
+    Output that is not JSON, such as an error message, is saved as-is."""
+    try:
+        data = load_json(output)
+    except ValueError:
+        save_text(output, path, command_str=command_str)
+        return
+    save_text(_json_to_table(data), path, command_str=command_str)
+    save_text(output, f"{os.path.splitext(path)[0]}.json")
 
 def save_binary(data, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "wb") as f:
-        f.write(data)
+    """Queues data to be written to path by the writer thread; see flush_writes()."""
+    _WRITE_Q.put((path, data))
+
+def save_file(src_path, path):
+    """Moves an already written file to path in the output, or into the tar stream when --tar is used."""
+    if ARCHIVE is not None:
+        with open(src_path, "rb") as f:
+            _add_to_archive(path, f, os.path.getsize(src_path))
+        os.remove(src_path)
+        return
+    if src_path != path:
+        _ensure_parent_dir(path)
+        os.replace(src_path, path)
+
+def open_compressed_writer(raw):
+    """Wraps a binary file in a streaming zstd compressor, or gzip when zstandard is not installed."""
+    if zstd is not None:
+        return zstd.ZstdCompressor(level=3, threads=-1).stream_writer(raw)
+    # Level 1 costs about half the CPU of the default level for a modestly larger file
+    return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=1)
+
+def stream_cmd_compressed(cmd, path, stdin_data=None, timeout=MYSQL_DUMP_TIMEOUT, chunk_size=STREAM_CHUNK_SIZE, compress=True):
+    """Streams a command's stdout through open_compressed_writer() into path in fixed-size chunks, so memory use stays constant.
+    With compress=False the output is already compressed and is copied as-is. stdin_data, if given, is written to the
+    command's stdin before its output is read. Returns the number of bytes read from stdout (compressed bytes when
+    compress=False); removes the partial file and raises CalledProcessError or TimeoutExpired on failure."""
+    _ensure_parent_dir(path)
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, executable=resolve_executable(cmd[0]), stdin=subprocess.PIPE if stdin_data else None,
+                                stdout=subprocess.PIPE, stderr=stderr_file, close_fds=False)
+        if stdin_data:
+            try:
+                proc.stdin.write(stdin_data)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass # The process exited early; its return code is checked below
+        timed_out = threading.Event()
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+
+        total = 0
+        try:
+            with open(path, "wb", buffering=STREAM_CHUNK_SIZE) as raw, \
+                 (open_compressed_writer(raw) if compress else contextlib.nullcontext(raw)) as writer:
+                while chunk := proc.stdout.read(chunk_size):
+                    writer.write(chunk)
+                    total += len(chunk)
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set() or proc.returncode != 0:
+            os.remove(path)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr_file.read())
+    return total
 
 def check_openstack_auth():
-    print("[INFO] Checking OpenStack authentication...")
+    log_debug("[INFO] Checking OpenStack authentication...")
     required_envs = ["OS_AUTH_URL", "OS_USERNAME", "OS_PROJECT_NAME"]
     missing_vars = [var for var in required_envs if not os.environ.get(var)]
     if missing_vars:
@@ -64,15 +453,117 @@ def check_openstack_auth():
         print("[HINT] Please source your OpenStack RC file (e.g., `source ~/admin-openrc.sh`)")
         exit(1)
 
-    result, _ = run_cmd(["openstack", "token", "issue"])
+    result, _ = run_cmd(["openstack", "token", "issue", "-f", "json"])
     if "ERROR" in result or "Missing" in result or "Failed" in result:
         print("[ERROR] Unable to authenticate with OpenStack.")
         print("[HINT] Please ensure your RC file is sourced and credentials are correct.")
         exit(1)
     print("[OK] OpenStack authentication validated.")
 
+    # Reuse the issued token for every later openstack call instead of re-authenticating each time.
+    # Tokens are valid for hours, far longer than a collection run.
+    try:
+        token_id = load_json(result)["id"]
+    except (ValueError, KeyError) as e:
+        print(f"[WARN] Could not read the issued token, each command will authenticate on its own: {e}")
+        return
+    os.environ["OS_TOKEN"] = token_id
+    os.environ["OS_AUTH_TYPE"] = "token"
+    os.environ.pop("OS_PASSWORD", None)
+    log_debug(f"[INFO] Reusing Keystone token for subsequent calls against {os.environ['OS_AUTH_URL']}")
+
+def connect_openstack_sdk():
+    """Opens a single authenticated openstacksdk session that is reused for structured lookups."""
+    global CONN
+    if openstack is None:
+        log_debug("[INFO] openstacksdk is not installed; structured lookups will use the openstack CLI.")
+        return
+    try:
+        CONN = openstack.connect(insecure=USE_INSECURE)
+        CONN.authorize()
+        print("[OK] openstacksdk session established.")
+    except Exception as e:
+        CONN = None
+        print(f"[WARN] Could not establish an openstacksdk session, falling back to the openstack CLI: {e}")
+
+@functools.lru_cache(maxsize=None)
+def sdk_get_server(vm_id):
+    """Returns the openstacksdk Server for a VM ID or name, or None if the SDK is unavailable or the lookup fails."""
+    if CONN is None:
+        return None
+    log_debug(f"[RUNNING] openstacksdk compute.find_server({vm_id})")
+    try:
+        with API_SEMAPHORE:
+            return CONN.compute.find_server(vm_id, ignore_missing=False)
+    except Exception as e:
+        print(f"[WARN] openstacksdk lookup of server {vm_id} failed, falling back to the openstack CLI: {e}")
+        return None
+
+def sdk_record(call_str, fetch):
+    """Runs fetch(CONN) and returns (data, json output, description) like show_record(), or None if the SDK is
+    unavailable or the lookup fails, in which case the caller falls back to the openstack CLI."""
+    if CONN is None:
+        return None
+    log_debug(f"[RUNNING] openstacksdk {call_str}")
+    try:
+        with API_SEMAPHORE:
+            result = fetch(CONN)
+            # List calls return generators that page lazily, so drain them while holding the semaphore
+            data = result.to_dict() if hasattr(result, "to_dict") else [item.to_dict() for item in result]
+    except Exception as e:
+        print(f"[WARN] openstacksdk {call_str} failed, falling back to the openstack CLI: {e}")
+        return None
+    return data, json.dumps(data, indent=2, default=str), f"openstacksdk {call_str}"
+
+def parse_record(output):
+    """Parses `-f json` command output, returning an empty dict for error output."""
+    try:
+        return load_json(output)
+    except ValueError:
+        return {}
+
+def show_record(cmd):
+    """Runs an openstack list/show command (as JSON, see run_cmd). Returns the parsed output (empty on failure),
+    the raw output for save_record(), and the command string."""
+    output, cmd_str = run_cmd(cmd)
+    return parse_record(output), output, cmd_str
+
+@functools.lru_cache(maxsize=None)
+def fetch_server_json(vm_id):
+    """Fetches `server show -f json` once per VM; see show_record() for the returned values."""
+    return show_record(["openstack", "server", "show", vm_id])
+
+def _resource_ref_id(value):
+    """Extracts an ID from a server's image/flavor field, which is a dict or a 'name (id)' string depending on the client version."""
+    if isinstance(value, dict):
+        return value.get("id") or value.get("original_name")
+    match = _PAREN_ID.search(value or "")
+    return match.group(1) if match else (value or None)
+
+@functools.lru_cache(maxsize=None)
+def server_fields(vm_id):
+    """Returns the image, flavor, volumes and project of a VM, read once from the SDK or the cached `server show`."""
+    server = sdk_get_server(vm_id)
+    if server is not None:
+        return {
+            "image_id": server.image.id if server.image else None,
+            # Flavor fallback only: newer compute microversions embed the flavor without an ID, just its name
+            # (original_name in the CLI record, see _resource_ref_id()), which `flavor show` accepts too
+            "flavor_id": (server.flavor.id or server.flavor.name) if server.flavor else None,
+            "volumes": [{"id": vol["id"]} for vol in server.attached_volumes or []],
+            "project_id": server.project_id,
+            "source": f"openstacksdk compute.find_server({vm_id})",
+        }
+    data, _, cmd_str = fetch_server_json(vm_id)
+    return {
+        "image_id": _resource_ref_id(data.get("image")),
+        "flavor_id": _resource_ref_id(data.get("flavor")),
+        "volumes": data.get("volumes_attached") or [],
+        "project_id": data.get("project_id"),
+        "source": cmd_str,
+    }
+
 def collect_health_checks():
-    os.makedirs(f"{OUTPUT_DIR}/health", exist_ok=True)
     cmds = {
         "compute_services": ["openstack", "compute", "service", "list", "--long", "--timing"],
         "resource_providers": ["openstack", "resource", "provider", "list"],
@@ -82,60 +573,81 @@ def collect_health_checks():
         "volume_services": ["openstack", "volume", "service", "list", "--long"],
         "cinder_pools": ["openstack", "volume", "backend", "pool", "list", "--long"],
     }
-    for name, cmd in cmds.items():
-        output, cmd_str = run_cmd(cmd)
-        save_text(output, f"{OUTPUT_DIR}/health/{name}.txt", command_str=cmd_str)
+    futures = {EXECUTOR.submit(run_cmd, cmd): name for name, cmd in cmds.items()}
+    for future in as_completed(futures):
+        output, cmd_str = future.result()
+        save_record(output, f"{OUTPUT_DIR}/health/{futures[future]}.txt", command_str=cmd_str)
 
 def collect_nova_info(vm_id):
-    os.makedirs(f"{OUTPUT_DIR}/nova", exist_ok=True)
-    info_text, cmd_str = run_cmd(["openstack", "server", "show", vm_id])
-    save_text(info_text, f"{OUTPUT_DIR}/nova/server_show.txt", command_str=cmd_str)
-    
-    # Collect hypervisor info
-    hypervisor_hostname = None
-    for line in info_text.splitlines():
-        if "OS-EXT-SRV-ATTR:hypervisor_hostname" in line:
-            parts = line.split('|')
-            if len(parts) > 2:
-                hypervisor_hostname = parts[2].strip()
-                break
-    
+    if not _claim("server", vm_id): return
+    # Events and migrations do not depend on the server record, so fetch them while it is being read
+    events_future = EXECUTOR.submit(run_cmd, ["openstack", "server", "event", "list", vm_id])
+    migrations_future = EXECUTOR.submit(run_cmd, ["openstack", "server", "migration", "list", "--server", vm_id])
+    server = sdk_get_server(vm_id)
+    if server is not None:
+        info_json = json.dumps(server.to_dict(), indent=2, default=str)
+        save_record(info_json, f"{OUTPUT_DIR}/nova/server_show.txt", command_str=f"openstacksdk compute.find_server({vm_id})")
+        hypervisor_hostname = server.hypervisor_hostname
+    else:
+        data, info_json, cmd_str = fetch_server_json(vm_id)
+        save_record(info_json, f"{OUTPUT_DIR}/nova/server_show.txt", command_str=cmd_str)
+        hypervisor_hostname = data.get("OS-EXT-SRV-ATTR:hypervisor_hostname")
+
     if hypervisor_hostname:
-        print(f"[INFO] Collecting details for hypervisor: {hypervisor_hostname}")
+        log_debug(f"[INFO] Collecting details for hypervisor: {hypervisor_hostname}")
         hypervisor_info, cmd_str_hv = run_cmd(["openstack", "hypervisor", "show", hypervisor_hostname])
-        save_text(hypervisor_info, f"{OUTPUT_DIR}/nova/hypervisor_{hypervisor_hostname}_show.txt", command_str=cmd_str_hv)
+        save_record(hypervisor_info, f"{OUTPUT_DIR}/nova/hypervisor_{hypervisor_hostname}_show.txt", command_str=cmd_str_hv)
     else:
         print(f"[WARN] Could not find hypervisor hostname for VM {vm_id}.")
 
-    events, cmd_str = run_cmd(["openstack", "server", "event", "list", vm_id])
-    save_text(events, f"{OUTPUT_DIR}/nova/server_events.txt", command_str=cmd_str)
-    migrations, cmd_str = run_cmd(["openstack", "server", "migration", "list", "--server", vm_id])
-    save_text(migrations, f"{OUTPUT_DIR}/nova/migrations.txt", command_str=cmd_str)
+    events, cmd_str = events_future.result()
+    save_record(events, f"{OUTPUT_DIR}/nova/server_events.txt", command_str=cmd_str)
+    migrations, cmd_str = migrations_future.result()
+    save_record(migrations, f"{OUTPUT_DIR}/nova/migrations.txt", command_str=cmd_str)
 
 def collect_ports_for_vm(vm_id):
-    os.makedirs(f"{OUTPUT_DIR}/neutron", exist_ok=True)
-    ports_raw, cmd_str = run_cmd(["openstack", "port", "list", "--device-id", vm_id])
-    save_text(ports_raw, f"{OUTPUT_DIR}/neutron/vm_ports_list.txt", command_str=cmd_str)
-    
-    port_ids_str, _ = run_cmd(["openstack", "port", "list", "--device-id", vm_id, "-c", "ID", "-f", "value"])
-    if "ERROR" in port_ids_str: return
-    
-    for port_id in port_ids_str.splitlines():
-        collect_port_info(port_id, is_dependency=True)
-        network_id, _ = run_cmd(["openstack", "port", "show", port_id, "-c", "network_id", "-f", "value"])
-        if network_id and "ERROR" not in network_id:
-            collect_network_info(network_id)
+    if not _claim("server_ports", vm_id): return
+    # The SDK listing already carries each port's network, so only the CLI path needs the extra `port show` calls
+    record = sdk_record(f"network.ports(device_id={vm_id})", lambda conn: conn.network.ports(device_id=vm_id))
+    if record is not None:
+        ports, ports_json, cmd_str = record
+        port_ids = [port["id"] for port in ports]
+    else:
+        ports_list, ports_json, cmd_str = show_record(["openstack", "port", "list", "--device-id", vm_id])
+        port_ids = [port["ID"] for port in ports_list or []]
+    save_record(ports_json, f"{OUTPUT_DIR}/neutron/vm_ports_list.txt", command_str=cmd_str)
+    if not port_ids: return
+
+    # Each port and network is collected as an independent branch, started as soon as that port's network
+    # is known, so this subtree takes as long as its slowest branch rather than the sum of all of them
+    if record is not None:
+        port_networks = [(port["id"], port.get("network_id")) for port in ports]
+    else:
+        # collect_port_info issues the same `port show` commands, so it reuses these cached results
+        show_futures = {EXECUTOR.submit(run_cmd, ["openstack", "port", "show", port_id]): port_id for port_id in port_ids}
+        port_networks = ((show_futures[future], parse_record(future.result()[0]).get("network_id"))
+                         for future in as_completed(show_futures))
+    branches = []
+    seen_network_ids = set()
+    for port_id, network_id in port_networks:
+        branches.append(TASK_EXECUTOR.submit(collect_port_info, port_id, is_dependency=True))
+        # Ports often share a network, which only needs one branch. collect_network_info also claims each
+        # network, so one already collected for another resource this run is skipped too.
+        if network_id and network_id not in seen_network_ids:
+            seen_network_ids.add(network_id)
+            branches.append(TASK_EXECUTOR.submit(collect_network_info, network_id))
+    for branch in branches:
+        branch.result()
 
 def collect_volumes_for_vm(vm_id):
-    os.makedirs(f"{OUTPUT_DIR}/cinder", exist_ok=True)
     try:
-        volumes_str, cmd_str = run_cmd(["openstack", "server", "show", vm_id, "-c", "volumes_attached", "-f", "value"])
-        if "ERROR" in volumes_str or not volumes_str.strip():
-            print(f"[INFO] No volumes attached to VM {vm_id}.")
+        fields = server_fields(vm_id)
+        attached_vols = fields["volumes"]
+        if not attached_vols:
+            log_debug(f"[INFO] No volumes attached to VM {vm_id}.")
             return
-        
-        attached_vols = ast.literal_eval(volumes_str)
-        save_text(json.dumps(attached_vols, indent=2), f"{OUTPUT_DIR}/cinder/attached_volumes_list.txt", command_str=cmd_str)
+
+        save_text(json.dumps(attached_vols, indent=2), f"{OUTPUT_DIR}/cinder/attached_volumes_list.txt", command_str=fields["source"])
         
         for vol in attached_vols:
             vol_id = vol.get("id")
@@ -145,172 +657,203 @@ def collect_volumes_for_vm(vm_id):
         print(f"[WARN] Failed to collect or parse volumes for VM {vm_id}: {e}")
 
 def collect_network_info(network_id):
-    print(f"[INFO] Collecting details for network: {network_id}")
-    os.makedirs(f"{OUTPUT_DIR}/neutron", exist_ok=True)
-    net_text, cmd_str = run_cmd(["openstack", "network", "show", network_id])
-    save_text(net_text, f"{OUTPUT_DIR}/neutron/network_{network_id}.txt", command_str=cmd_str)
-    
-    subnet_ids_str, _ = run_cmd(["openstack", "subnet", "list", "--network", network_id, "-c", "ID", "-f", "value"])
-    if "ERROR" in subnet_ids_str: return
-    
-    print(f"[INFO] Found {len(subnet_ids_str.splitlines())} subnets for network {network_id}")
-    for subnet_id in subnet_ids_str.splitlines():
-        subnet_detail, cmd_str_subnet = run_cmd(["openstack", "subnet", "show", subnet_id])
-        save_text(subnet_detail, f"{OUTPUT_DIR}/neutron/subnet_{subnet_id}.txt", command_str=cmd_str_subnet)
+    if not _claim("network", network_id): return
+    log_debug(f"[INFO] Collecting details for network: {network_id}")
+    (net_text, cmd_str), (subnet_list_json, _) = run_cmds([
+        ["openstack", "network", "show", network_id],
+        ["openstack", "subnet", "list", "--network", network_id, "-c", "ID"],
+    ])
+    save_record(net_text, f"{OUTPUT_DIR}/neutron/network_{network_id}.txt", command_str=cmd_str)
+
+    subnet_list = parse_record(subnet_list_json)
+    if not subnet_list: return
+
+    subnet_ids = [subnet["ID"] for subnet in subnet_list]
+    log_debug(f"[INFO] Found {len(subnet_ids)} subnets for network {network_id}")
+    subnet_ids = [subnet_id for subnet_id in subnet_ids if _claim("subnet", subnet_id)]
+    subnet_details = run_cmds([["openstack", "subnet", "show", subnet_id] for subnet_id in subnet_ids])
+    for subnet_id, (subnet_detail, cmd_str_subnet) in zip(subnet_ids, subnet_details):
+        save_record(subnet_detail, f"{OUTPUT_DIR}/neutron/subnet_{subnet_id}.txt", command_str=cmd_str_subnet)
 
 def collect_port_info(port_id, is_dependency=False):
     prefix = "vm_port" if is_dependency else "port"
-    print(f"[INFO] Collecting details for port: {port_id}")
-    os.makedirs(f"{OUTPUT_DIR}/neutron", exist_ok=True)
-    port_text, cmd_str = run_cmd(["openstack", "port", "show", port_id])
-    save_text(port_text, f"{OUTPUT_DIR}/neutron/{prefix}_{port_id}.txt", command_str=cmd_str)
+    log_debug(f"[INFO] Collecting details for port: {port_id}")
+    data, port_json, cmd_str = show_record(["openstack", "port", "show", port_id])
+    save_record(port_json, f"{OUTPUT_DIR}/neutron/{prefix}_{port_id}.txt", command_str=cmd_str)
     try:
-        sg_ids_str, _ = run_cmd(["openstack", "port", "show", port_id, "-c", "security_group_ids", "-f", "value"])
-        if "ERROR" in sg_ids_str: return
-        
-        sg_ids = ast.literal_eval(sg_ids_str)
-        print(f"[INFO] Found {len(sg_ids)} security groups for port {port_id}")
-        for sg_id in sg_ids:
-            sg_detail, cmd_str_sg = run_cmd(["openstack", "security", "group", "show", sg_id])
-            save_text(sg_detail, f"{OUTPUT_DIR}/neutron/security_group_{sg_id}.txt", command_str=cmd_str_sg)
-            sg_rules, cmd_str_rules = run_cmd(["openstack", "security", "group", "rule", "list", sg_id])
-            save_text(sg_rules, f"{OUTPUT_DIR}/neutron/security_group_{sg_id}_rules.txt", command_str=cmd_str_rules)
+        if not data: return
+        sg_ids = data.get("security_group_ids") or []
+        log_debug(f"[INFO] Found {len(sg_ids)} security groups for port {port_id}")
+        sg_ids = [sg_id for sg_id in sg_ids if _claim("sg", sg_id)]
+        if not sg_ids: return
+
+        # Two project-wide list calls replace a show and a rule list per group
+        groups, rules = {}, {}
+        if data.get("project_id"):
+            (groups_json, cmd_str_sg), (rules_json, cmd_str_rules) = project_security_groups(data["project_id"])
+            group_list, rule_list = parse_record(groups_json), parse_record(rules_json)
+            # If either listing failed, every group falls back to the per-group calls below, rather than
+            # being saved with an empty rule list that reads as "no rules"
+            if isinstance(group_list, list) and isinstance(rule_list, list):
+                groups = {group["ID"]: group for group in group_list}
+                for rule in rule_list:
+                    rules.setdefault(rule.get("Security Group"), []).append(rule)
+        for sg_id in [sg_id for sg_id in sg_ids if sg_id in groups]:
+            save_record(json.dumps(groups[sg_id], indent=2), f"{OUTPUT_DIR}/neutron/security_group_{sg_id}.txt", command_str=cmd_str_sg)
+            save_record(json.dumps(rules.get(sg_id, []), indent=2), f"{OUTPUT_DIR}/neutron/security_group_{sg_id}_rules.txt",
+                        command_str=cmd_str_rules)
+
+        # Groups shared from another project are not in the port's project listing, so they are fetched one by one
+        sg_ids = [sg_id for sg_id in sg_ids if sg_id not in groups]
+        results = run_cmds([["openstack", "security", "group", "show", sg_id] for sg_id in sg_ids] +
+                           [["openstack", "security", "group", "rule", "list", sg_id] for sg_id in sg_ids])
+        sg_details, sg_rule_lists = results[:len(sg_ids)], results[len(sg_ids):]
+        for sg_id, (sg_detail, cmd_str_sg), (sg_rules, cmd_str_rules) in zip(sg_ids, sg_details, sg_rule_lists):
+            save_record(sg_detail, f"{OUTPUT_DIR}/neutron/security_group_{sg_id}.txt", command_str=cmd_str_sg)
+            save_record(sg_rules, f"{OUTPUT_DIR}/neutron/security_group_{sg_id}_rules.txt", command_str=cmd_str_rules)
     except Exception as e:
         print(f"[WARN] Could not collect security groups for port {port_id}: {e}")
 
 def collect_volume_details(volume_id, is_dependency=False):
     prefix = "attached_volume" if is_dependency else "volume"
-    print(f"[INFO] Collecting details for volume: {volume_id}")
-    os.makedirs(f"{OUTPUT_DIR}/cinder", exist_ok=True)
-    
-    # Save the human-readable table output
-    vol_detail_table, cmd_str_table = run_cmd(["openstack", "volume", "show", volume_id])
-    save_text(vol_detail_table, f"{OUTPUT_DIR}/cinder/{prefix}_{volume_id}.txt", command_str=cmd_str_table)
+    log_debug(f"[INFO] Collecting details for volume: {volume_id}")
 
-    # Get attachments reliably using JSON format to avoid parsing truncated table output
-    attachments_json_str, _ = run_cmd(["openstack", "volume", "show", volume_id, "-c", "attachments", "-f", "json"])
-    
-    if attachments_json_str and "ERROR" not in attachments_json_str:
-        try:
-            data = json.loads(attachments_json_str)
-            attachments = data.get("attachments", [])
-            
-            if isinstance(attachments, list):
-                for attachment in attachments:
-                    attachment_id = attachment.get("attachment_id")
-                    server_id = attachment.get("server_id")
-                    if attachment_id:
-                        print(f"[INFO] Collecting details for volume attachment: {attachment_id} (VM: {server_id})")
-                        # CORRECTED COMMAND: Removed the invalid "--volume" argument
-                        attachment_detail, cmd_str_attach = run_cmd(["openstack", "volume", "attachment", "show", attachment_id])
-                        save_text(attachment_detail, f"{OUTPUT_DIR}/cinder/volume_{volume_id}_attachment_{attachment_id}.txt", command_str=cmd_str_attach)
-                    
-                    # If called via --volume, also grab details for the attached VM
-                    if server_id and not is_dependency:
-                        print(f"[INFO] Volume {volume_id} is attached to VM {server_id}. Collecting related VM info...")
-                        collect_nova_info(server_id)
-                        collect_ports_for_vm(server_id)
-
-        except json.JSONDecodeError as e:
-            print(f"[WARN] Could not parse JSON attachments for volume {volume_id}: {e}")
-    else:
-        print(f"[INFO] No attachment information found for volume {volume_id}.")
+    # A single JSON fetch gives both the saved artifact and reliably parseable attachments
+    record = sdk_record(f"block_storage.find_volume({volume_id})",
+                        lambda conn: conn.block_storage.find_volume(volume_id, ignore_missing=False))
+    data, vol_json, cmd_str = record or show_record(["openstack", "volume", "show", volume_id])
+    save_record(vol_json, f"{OUTPUT_DIR}/cinder/{prefix}_{volume_id}.txt", command_str=cmd_str)
+
+    attachments = data.get("attachments")
+    if not isinstance(attachments, list):
+        log_debug(f"[INFO] No attachment information found for volume {volume_id}.")
+        return
+
+    attachment_ids = [attachment["attachment_id"] for attachment in attachments
+                      if attachment.get("attachment_id") and _claim("attachment", attachment["attachment_id"])]
+    log_debug(f"[INFO] Collecting details for {len(attachment_ids)} attachments of volume {volume_id}")
+    # CORRECTED COMMAND: Removed the invalid "--volume" argument
+    attachment_details = run_cmds([["openstack", "volume", "attachment", "show", attachment_id] for attachment_id in attachment_ids])
+    for attachment_id, (attachment_detail, cmd_str_attach) in zip(attachment_ids, attachment_details):
+        save_record(attachment_detail, f"{OUTPUT_DIR}/cinder/volume_{volume_id}_attachment_{attachment_id}.txt", command_str=cmd_str_attach)
+
+    for attachment in attachments:
+        server_id = attachment.get("server_id")
+        # If called via --volume, also grab details for the attached VM
+        if server_id and not is_dependency:
+            log_debug(f"[INFO] Volume {volume_id} is attached to VM {server_id}. Collecting related VM info...")
+            collect_nova_info(server_id)
+            collect_ports_for_vm(server_id)
 
 
 def collect_stack_info(stack_id):
-    os.makedirs(f"{OUTPUT_DIR}/heat", exist_ok=True)
-    stack_show, cmd_str = run_cmd(["openstack", "stack", "show", stack_id])
-    save_text(stack_show, f"{OUTPUT_DIR}/heat/stack_show.txt", command_str=cmd_str)
-    
-    resource_list_raw, cmd_str = run_cmd(["openstack", "stack", "resource", "list", stack_id])
-    save_text(resource_list_raw, f"{OUTPUT_DIR}/heat/stack_resources.txt", command_str=cmd_str)
-    
-    resource_names_str, _ = run_cmd(["openstack", "stack", "resource", "list", stack_id, "-c", "resource_name", "-f", "value"])
-    if "ERROR" in resource_names_str: return
-    
-    for res_name in resource_names_str.splitlines():
-        res_show, cmd_str_res = run_cmd(["openstack", "stack", "resource", "show", stack_id, res_name])
-        save_text(res_show, f"{OUTPUT_DIR}/heat/resource_{res_name}.txt", command_str=cmd_str_res)
+    stack_future = EXECUTOR.submit(run_cmd, ["openstack", "stack", "show", stack_id])
+    record = sdk_record(f"orchestration.resources({stack_id})", lambda conn: conn.orchestration.resources(stack_id))
+    if record is not None:
+        resources, resource_list_json, cmd_str_list = record
+        res_names = [resource["name"] for resource in resources]
+    else:
+        resources, resource_list_json, cmd_str_list = show_record(["openstack", "stack", "resource", "list", stack_id])
+        res_names = [resource["resource_name"] for resource in resources or []]
+    stack_show, cmd_str = stack_future.result()
+    save_record(stack_show, f"{OUTPUT_DIR}/heat/stack_show.txt", command_str=cmd_str)
+    save_record(resource_list_json, f"{OUTPUT_DIR}/heat/stack_resources.txt", command_str=cmd_str_list)
+    if not res_names: return
+
+    res_shows = run_cmds([["openstack", "stack", "resource", "show", stack_id, res_name] for res_name in res_names])
+    for res_name, (res_show, cmd_str_res) in zip(res_names, res_shows):
+        save_record(res_show, f"{OUTPUT_DIR}/heat/resource_{res_name}.txt", command_str=cmd_str_res)
 
 def collect_image_details(image_id, is_dependency=False, vm_id=None):
     """Collects details for a specific Glance image."""
     prefix = f"image_of_vm_{vm_id}" if is_dependency and vm_id else f"image_{image_id}"
-    print(f"[INFO] Collecting details for image: {image_id}")
-    os.makedirs(f"{OUTPUT_DIR}/glance", exist_ok=True)
-    
-    image_details, cmd_str = run_cmd(["openstack", "image", "show", image_id])
-    save_text(image_details, f"{OUTPUT_DIR}/glance/{prefix}.txt", command_str=cmd_str)
+    # Keyed on the artifact, as the same image may be saved both as a VM's image and for --image
+    if not _claim("image", prefix): return
+    log_debug(f"[INFO] Collecting details for image: {image_id}")
+
+    record = sdk_record(f"image.find_image({image_id})", lambda conn: conn.image.find_image(image_id, ignore_missing=False))
+    _, image_details, cmd_str = record or show_record(["openstack", "image", "show", image_id])
+    save_record(image_details, f"{OUTPUT_DIR}/glance/{prefix}.txt", command_str=cmd_str)
 
 def collect_image_and_flavor(vm_id):
-    os.makedirs(f"{OUTPUT_DIR}/nova", exist_ok=True)
-    
-    image_id_str, _ = run_cmd(["openstack", "server", "show", vm_id, "-c", "image", "-f", "value"])
-    image_match = re.search(r'\(([^)]+)\)', image_id_str)
-    image_id = image_match.group(1) if image_match else None
-        
-    print("[INFO] Attempting to determine flavor ID...")
-    flavor_id = None
-    flavor_id_str, _ = run_cmd(["openstack", "server", "show", vm_id, "-c", "flavor", "-f", "value"])
-
-    flavor_match = re.search(r'\(([^)]+)\)', flavor_id_str)
-    if flavor_match:
-        flavor_id = flavor_match.group(1)
-        print(f"[INFO] Found flavor ID '{flavor_id}' using regex match.")
-    elif flavor_id_str.strip().startswith('{'):
-        try:
-            flavor_dict = ast.literal_eval(flavor_id_str)
-            if isinstance(flavor_dict, dict) and 'id' in flavor_dict:
-                flavor_id = flavor_dict['id']
-                print(f"[INFO] Found flavor ID '{flavor_id}' by parsing dictionary output.")
-        except (ValueError, SyntaxError) as e:
-            print(f"[WARN] Could not parse flavor output as a dictionary: {e}")
+    fields = server_fields(vm_id)
+    image_id, flavor_id = fields["image_id"], fields["flavor_id"]
+    log_debug(f"[INFO] Found image ID '{image_id}' and flavor '{flavor_id}' from the server record.")
 
+    # The image is collected on a separate branch while the flavor is fetched here
+    image_branch = None
     if image_id and "ERROR" not in image_id:
-        collect_image_details(image_id, is_dependency=True, vm_id=vm_id)
+        image_branch = TASK_EXECUTOR.submit(collect_image_details, image_id, is_dependency=True, vm_id=vm_id)
     else:
-        print("[INFO] No image ID found for this VM. Skipping image details.")
-        
+        log_debug("[INFO] No image ID found for this VM. Skipping image details.")
+
     if flavor_id and "ERROR" not in flavor_id:
-        print(f"[INFO] Collecting details for flavor: {flavor_id}")
-        flavor, cmd_str = run_cmd(["openstack", "flavor", "show", flavor_id])
-        save_text(flavor, f"{OUTPUT_DIR}/nova/flavor_show.txt", command_str=cmd_str)
+        if _claim("flavor", flavor_id):
+            log_debug(f"[INFO] Collecting details for flavor: {flavor_id}")
+            flavor, cmd_str = run_cmd(["openstack", "flavor", "show", flavor_id])
+            save_record(flavor, f"{OUTPUT_DIR}/nova/flavor_show.txt", command_str=cmd_str)
     else:
         print("[WARN] Could not determine a valid flavor ID. Skipping flavor details.")
 
+    if image_branch:
+        image_branch.result()
+
 def collect_keystone_user_info(user_id_or_name):
-    os.makedirs(f"{OUTPUT_DIR}/keystone", exist_ok=True)
-    user_info, cmd_str = run_cmd(["openstack", "user", "show", user_id_or_name])
-    save_text(user_info, f"{OUTPUT_DIR}/keystone/user_show.txt", command_str=cmd_str)
-    role_assignments, cmd_str_roles = run_cmd(["openstack", "role", "assignment", "list", "--user", user_id_or_name, "--names"])
-    save_text(role_assignments, f"{OUTPUT_DIR}/keystone/user_role_assignments.txt", command_str=cmd_str_roles)
+    (user_info, cmd_str), (role_assignments, cmd_str_roles) = run_cmds([
+        ["openstack", "user", "show", user_id_or_name],
+        ["openstack", "role", "assignment", "list", "--user", user_id_or_name, "--names"],
+    ])
+    save_record(user_info, f"{OUTPUT_DIR}/keystone/user_show.txt", command_str=cmd_str)
+    save_record(role_assignments, f"{OUTPUT_DIR}/keystone/user_role_assignments.txt", command_str=cmd_str_roles)
 
 def collect_quota_info(project_id):
     if not project_id:
         print("[WARN] No project ID provided for quota collection.")
         return
-    print(f"[INFO] Collecting quotas for project: {project_id}")
-    os.makedirs(f"{OUTPUT_DIR}/quota", exist_ok=True)
+    log_debug(f"[INFO] Collecting quotas for project: {project_id}")
     quota_details, cmd_str = run_cmd(["openstack", "quota", "show", project_id])
-    save_text(quota_details, f"{OUTPUT_DIR}/quota/project_{project_id}_quota.txt", command_str=cmd_str)
+    save_record(quota_details, f"{OUTPUT_DIR}/quota/project_{project_id}_quota.txt", command_str=cmd_str)
+
+def _walk_files(root):
+    """Yields the path of every regular file below root."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path
 
 def archive_output():
-    zip_path = shutil.make_archive(OUTPUT_DIR, 'zip', OUTPUT_DIR)
+    """Zips the output directory. Text artifacts use fast level-1 deflate; already-compressed files such as the
+    database dump are stored as-is, since deflating them again costs minutes and saves nothing."""
+    zip_path = os.path.abspath(f"{OUTPUT_DIR}.zip")
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1, allowZip64=True) as zf:
+        for path in sorted(_walk_files(OUTPUT_DIR)):
+            compress_type = zipfile.ZIP_STORED if path.endswith(PRECOMPRESSED_SUFFIXES) else zipfile.ZIP_DEFLATED
+            zf.write(path, os.path.relpath(path, OUTPUT_DIR), compress_type=compress_type)
     print(f"[DONE] Output archived at: {zip_path}")
 
 def collect_mysql_dump(namespace, db_pod_label, db_service_name):
     """Connects to a Percona HAProxy pod to perform a MySQL dump, parsing Consul data with PyYAML."""
-    print(f"[INFO] Starting MySQL dump for namespace: {namespace}")
-    os.makedirs(f"{OUTPUT_DIR}/database", exist_ok=True)
+    log_debug(f"[INFO] Starting MySQL dump for namespace: {namespace}")
 
     try:
-        print("[INFO] Fetching DB configuration from consul...")
-        cmd_get_db_config = f'kubectl exec deploy/resmgr -c resmgr -n {namespace} -- bash -l -c "consul-dump-yaml --start-key customers/\\$CUSTOMER_ID/regions/\\$REGION_ID/db"'
-        db_config_yaml, _ = run_cmd(cmd_get_db_config, shell=True)
-        if "ERROR" in db_config_yaml:
+        # Both Consul reads run in a single exec to save a kubectl round-trip. The dbservers subtree is dumped whole
+        # because the server name is only known after parsing the first document.
+        log_debug("[INFO] Fetching DB configuration and credentials from consul...")
+        consul_script = (f"consul-dump-yaml --start-key customers/$CUSTOMER_ID/regions/$REGION_ID/db && echo '{CONSUL_SPLIT_MARKER}' && "
+                         "consul-dump-yaml --start-key customers/$CUSTOMER_ID/dbservers")
+        cmd_get_db_config = ["kubectl", "exec", "deploy/resmgr", "-c", "resmgr", "-n", namespace, "--", "bash", "-l", "-c", consul_script]
+        # Pod discovery does not depend on Consul, so it runs alongside the exec
+        log_debug(f"[INFO] Finding a database pod using label: '{db_pod_label}'...")
+        cmd_get_pod = ["kubectl", "get", "pods", "-n", namespace, "-l", db_pod_label, "-o", "jsonpath={.items[0].metadata.name}"]
+        (consul_yaml, _), (db_pod_name, _) = run_cmds([cmd_get_db_config, cmd_get_pod])
+        if "ERROR" in consul_yaml or CONSUL_SPLIT_MARKER not in consul_yaml:
             print("[ERROR] Could not fetch DB config from resmgr/consul. Aborting.")
             return
+        db_config_yaml, pass_config_yaml = consul_yaml.split(CONSUL_SPLIT_MARKER, 1)
 
-        data = yaml.safe_load(db_config_yaml)
+        data = yaml.load(db_config_yaml, Loader=YamlSafeLoader)
         
         customer_id = list(data['customers'].keys())[0]
         region_id = list(data['customers'][customer_id]['regions'].keys())[0]
@@ -320,49 +863,66 @@ def collect_mysql_dump(namespace, db_pod_label, db_service_name):
             print("[ERROR] Could not parse DB server name from Consul YAML. Aborting.")
             return
 
-        print(f"[INFO] Found DB server: {db_server}. Fetching password...")
-        cmd_get_pass_config = f'kubectl exec deploy/resmgr -c resmgr -n {namespace} -- bash -l -c "consul-dump-yaml --start-key customers/\\$CUSTOMER_ID/dbservers/{db_server}"'
-        pass_config_yaml, _ = run_cmd(cmd_get_pass_config, shell=True)
-        if "ERROR" in pass_config_yaml:
-            print("[ERROR] Could not fetch DB password config from resmgr/consul. Aborting.")
-            return
-        
-        pass_data = yaml.safe_load(pass_config_yaml)
+        log_debug(f"[INFO] Found DB server: {db_server}.")
+        pass_data = yaml.load(pass_config_yaml, Loader=YamlSafeLoader)
         db_admin_pass = pass_data['customers'][customer_id]['dbservers'][db_server]['admin_pass']
 
         if not db_admin_pass:
             print("[ERROR] Could not parse DB admin password from Consul YAML. Aborting.")
             return
 
-        print(f"[INFO] Finding a database pod using label: '{db_pod_label}'...")
-        cmd_get_pod = f"kubectl get pods -n {namespace} -l {db_pod_label} -o jsonpath='{{.items[0].metadata.name}}'"
-        db_pod_name, _ = run_cmd(cmd_get_pod, shell=True)
-        
         if "ERROR" in db_pod_name or not db_pod_name:
             print(f"[ERROR] Could not find a pod with label '{db_pod_label}' in namespace '{namespace}'. Aborting.")
             return
-        print(f"[INFO] Found pod to connect to: {db_pod_name}")
+        log_debug(f"[INFO] Found pod to connect to: {db_pod_name}")
 
-        print("[INFO] Performing mysqldump...")
-        cmd_dump_str = f"kubectl exec -i {db_pod_name} -c haproxy -n {namespace} -- bash -l -c \"MYSQL_PWD='{db_admin_pass}' mysqldump -h {db_service_name} --single-transaction --all-databases -u root\""
-        
-        print(f"[RUNNING] {cmd_dump_str}")
-        result = subprocess.run(cmd_dump_str, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=1800)
+        log_debug("[INFO] Performing mysqldump...")
+        # The password is sent on stdin rather than embedded in the command, so it never needs shell quoting
+        # and does not show up in the process list or the log output
+        mysqldump_cmd = f"mysqldump -h {shlex.quote(db_service_name)} --single-transaction --all-databases -u root"
+        if zstd is not None:
+            dump_script = f"IFS= read -r MYSQL_PWD && export MYSQL_PWD && exec {mysqldump_cmd}"
+        else:
+            # pipefail keeps a mysqldump failure from being masked by the compressor's exit status
+            dump_script = f"set -o pipefail && IFS= read -r MYSQL_PWD && export MYSQL_PWD && {mysqldump_cmd} | {POD_GZIP_CMD}"
+        cmd_dump = ["kubectl", "exec", "-i", db_pod_name, "-c", "haproxy", "-n", namespace, "--", "bash", "-l", "-c", dump_script]
 
-        if result.returncode != 0:
-            print(f"[ERROR] mysqldump command failed:\n{result.stderr.decode('utf-8', 'ignore').strip()}")
+        dump_filename = f"{OUTPUT_DIR}/database/mysql_dump_all_databases.sql{COMPRESSED_SUFFIX}"
+        dump_target = dump_filename
+        if ARCHIVE is not None:
+            # A tar entry needs its size up front, so with --tar the dump is staged in a private (0600) temp file
+            # next to the archive, on the same filesystem that is about to hold the dump anyway
+            fd, dump_target = tempfile.mkstemp(prefix="pcddbg-dump-", suffix=f".sql{COMPRESSED_SUFFIX}",
+                                               dir=os.path.dirname(os.path.abspath(OUTPUT_DIR)))
+            os.close(fd)
+        log_debug(f"[RUNNING] {' '.join(cmd_dump)}")
+        try:
+            dump_size = stream_cmd_compressed(cmd_dump, dump_target, stdin_data=f"{db_admin_pass}\n".encode(),
+                                              chunk_size=DUMP_CHUNK_SIZE, compress=zstd is not None)
+        except subprocess.CalledProcessError as e:
+            print(f"[ERROR] mysqldump command failed:\n{e.stderr.decode('utf-8', 'ignore').strip()}")
             return
 
-        if not result.stdout:
+        if dump_size and zstd is None:
+            # The pod compressed the output, and an empty dump still makes a ~20-byte gzip stream,
+            # so look for a first decompressed byte instead
+            try:
+                with gzip.open(dump_target, "rb") as f:
+                    dump_size = len(f.read(1))
+            except (OSError, EOFError) as e:
+                print(f"[ERROR] The compressed mysqldump output is not valid gzip: {e}")
+                os.remove(dump_target)
+                return
+
+        if not dump_size:
             print("[WARN] mysqldump produced no output.")
+            os.remove(dump_target)
             return
-        
-        print("[INFO] Compressing dump file...")
-        dump_filename = f"{OUTPUT_DIR}/database/mysql_dump_all_databases.sql.gz"
-        compressed_data = gzip.compress(result.stdout)
-        
-        save_binary(compressed_data, dump_filename)
-        print(f"[OK] MySQL dump saved to {dump_filename}")
+        save_file(dump_target, dump_filename)
+        if ARCHIVE is not None:
+            print(f"[OK] MySQL dump saved as {os.path.relpath(dump_filename, OUTPUT_DIR)} in {ARCHIVE_PATH}")
+        else:
+            print(f"[OK] MySQL dump saved to {dump_filename}")
 
     except (subprocess.TimeoutExpired, yaml.YAMLError, KeyError, IndexError) as e:
         print(f"[ERROR] An error occurred during the MySQL dump process: {e}")
@@ -371,11 +931,13 @@ def collect_mysql_dump(namespace, db_pod_label, db_service_name):
         print(f"[ERROR] An unexpected error occurred: {e}")
 
 def main():
-    global OUTPUT_DIR, USE_INSECURE
+    global OUTPUT_DIR, USE_INSECURE, QUIET
     parser = argparse.ArgumentParser(description="Cloud Debug Collector")
     parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Output directory")
     parser.add_argument("--zip", action="store_true", help="Zip output")
+    parser.add_argument("--tar", action="store_true", help="Stream output straight into a compressed tar archive instead of a directory.")
     parser.add_argument("--insecure", action="store_true", help="Bypass SSL verification for OpenStack commands.")
+    parser.add_argument("--quiet", action="store_true", help="Only print warnings, errors and results, not per-command progress.")
 
     # OpenStack flags
     parser.add_argument("--vm", help="VM ID or Name")
@@ -393,26 +955,36 @@ def main():
     parser.add_argument("--db-service-name", default="percona-db-pxc-db-haproxy", help="The Kubernetes service name of the database.")
 
     args = parser.parse_args()
+    # Validate before any work starts, so a bad invocation does not sit through authentication and health checks first
+    if args.mysql_dump and not args.namespace:
+        parser.error("the '--namespace' argument is required when using '--mysql-dump'")
     OUTPUT_DIR = args.output
     USE_INSECURE = args.insecure
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
+    QUIET = args.quiet
     is_openstack_command = any([args.vm, args.image, args.network, args.port, args.volume, args.stack, args.user])
+    # The openstackclient server is forked, so it has to start before the writer thread and the
+    # tar stream's compressor threads exist
+    if is_openstack_command:
+        start_openstack_server()
+
+    if args.tar:
+        archive_path = open_tar_archive()
+    else:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+    start_writer_thread()
 
     if is_openstack_command:
         check_openstack_auth()
+        connect_openstack_sdk()
         collect_health_checks()
-        collected_project_ids = set()
+        project_ids = [] # Projects whose quotas are collected once everything else is done
 
         if args.vm:
             collect_nova_info(args.vm)
             collect_image_and_flavor(args.vm)
             collect_ports_for_vm(args.vm)
             collect_volumes_for_vm(args.vm)
-            project_id, _ = run_cmd(["openstack", "server", "show", args.vm, "-c", "project_id", "-f", "value"])
-            if project_id and "ERROR" not in project_id and project_id not in collected_project_ids:
-                collect_quota_info(project_id)
-                collected_project_ids.add(project_id)
+            project_ids.append(server_fields(args.vm)["project_id"])
 
         if args.image:
             collect_image_details(args.image)
@@ -428,24 +1000,28 @@ def main():
 
         if args.stack:
             collect_stack_info(args.stack)
-            project_id, _ = run_cmd(["openstack", "stack", "show", args.stack, "-c", "project", "-f", "value"])
-            if project_id and "ERROR" not in project_id and project_id not in collected_project_ids:
-                collect_quota_info(project_id)
-                collected_project_ids.add(project_id)
+            project_ids.append(show_record(["openstack", "stack", "show", args.stack])[0].get("project"))
 
         if args.user:
             collect_keystone_user_info(args.user)
-            project_id, _ = run_cmd(["openstack", "user", "show", args.user, "-c", "default_project_id", "-f", "value"])
-            if project_id and "ERROR" not in project_id and project_id not in collected_project_ids:
-                collect_quota_info(project_id)
-                collected_project_ids.add(project_id)
+            project_ids.append(show_record(["openstack", "user", "show", args.user])[0].get("default_project_id"))
+
+        # The VM, stack and user often share a project, so each distinct project's quota is fetched once, all in parallel
+        unique_project_ids = dict.fromkeys(project_id for project_id in project_ids if project_id and "ERROR" not in project_id)
+        for future in [EXECUTOR.submit(collect_quota_info, project_id) for project_id in unique_project_ids]:
+            future.result()
 
     if args.mysql_dump:
-        if not args.namespace:
-            print("[ERROR] The '--namespace' argument is required when using '--mysql-dump'.")
-            exit(1)
         collect_mysql_dump(args.namespace, args.db_pod_label, args.db_service_name)
 
+    flush_writes()
+    if args.tar:
+        close_tar_archive()
+        if args.zip:
+            log_debug("[INFO] Skipping --zip, the output is already archived.")
+        print(f"[DONE] All debug information saved to: {os.path.abspath(archive_path)}")
+        return
+
     if args.zip:
         archive_output()
 